@@ -123,6 +123,10 @@ def main():
                                                help='Get the MQTT Host URL\
                                                      to be used in the\
                                                      firmware')
+    getmqtthost_parser.add_argument('--no-cache',
+                                    action='store_true',
+                                    help='Get the MQTT Host URL from the\
+                                          server instead of the local cache')
     getmqtthost_parser.set_defaults(func=get_mqtt_host)
 
     claim_parser = subparsers.add_parser('claim',
@@ -171,6 +175,16 @@ def main():
                                         type=str,
                                         metavar='<ota_image_path>',
                                         help='OTA Firmware image path')
+    upload_ota_image_parser.add_argument('--raw-upload',
+                                         action='store_true',
+                                         help='Upload OTA Firmware image as '
+                                              'multipart/form-data instead of '
+                                              'base64 encoded JSON. '
+                                              'Experimental: the server is not '
+                                              'known to accept multipart '
+                                              'uploads, in which case the '
+                                              'image is uploaded a second '
+                                              'time as base64 encoded JSON')
     upload_ota_image_parser.set_defaults(func=ota_upgrade)
 
     args = parser.parse_args()
@@ -12,18 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
-import re
-import os
 import sys
+import logging
+import functools
 import time
+import random
 import requests
-import base64
+import binascii
 from pathlib import Path
+from os import path
 
 try:
     from rmaker_lib import session, node, device, service,\
-        serverconfig, configmanager
+        serverconfig, configmanager, http_session, json_utils
     from rmaker_lib.exceptions import NetworkError, InvalidJSONError, SSLError,\
         RequestTimeoutError
     from rmaker_lib.logger import log
@@ -33,6 +34,117 @@ except ImportError as err:
     raise err
 
 MAX_HTTP_CONNECTION_RETRIES = 5
+# Multiple of 3 so that encoded chunks need no base64 padding in between
+OTA_IMAGE_READ_CHUNK_SIZE = 57 * 1024
+# Maximum size (in bytes) of JSON data accepted by set_params
+MAX_PARAMS_DATA_SIZE = 1 << 20
+# MQTT Host endpoint cache, valid for 24 hours
+MQTT_HOST_CACHE_FILE = 'mqtt_host.cache'
+MQTT_HOST_CACHE_TTL = 24 * 60 * 60
+# Exponential backoff (in seconds) between retries
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+
+_HEX_DIGITS = frozenset(b'0123456789abcdefABCDEF')
+_MAC_COLON_POSITIONS = (2, 5, 8, 11, 14)
+
+
+def _print_json(obj):
+    """
+    Print `obj` as JSON, pretty-printed only if stdout is a terminal.
+
+    :param obj: Object to print
+    :type obj: dict | list
+    """
+    indent = 4 if sys.stdout.isatty() else None
+    print(json_utils.dumps(obj, indent=indent))
+
+
+def _b64encode_file(filepath):
+    """
+    Base64 encode file contents, reading the file in chunks so that
+    the raw file contents are not held in memory.
+
+    :param filepath: Path of the file to encode
+    :type filepath: str
+
+    :return: Base64 encoded file contents
+    :rtype: bytearray
+    """
+    encoded = bytearray()
+    with open(filepath, 'rb') as f:
+        while True:
+            chunk = f.read(OTA_IMAGE_READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            encoded += binascii.b2a_base64(chunk, newline=False)
+    return encoded
+
+
+def _valid_mac(mac):
+    """
+    Check if MAC address is in the format AABBCC112233
+    or AA:BB:CC:11:22:33 (case insensitive).
+
+    :param mac: MAC address
+    :type mac: str
+
+    :return: True if MAC address is valid, False otherwise
+    :rtype: bool
+    """
+    b = mac.encode('ascii', 'replace')
+    if len(b) == 17:
+        return (all(b[i] == ord(':') for i in _MAC_COLON_POSITIONS) and
+                all(c in _HEX_DIGITS for i, c in enumerate(b)
+                    if i not in _MAC_COLON_POSITIONS))
+    if len(b) == 12:
+        return all(c in _HEX_DIGITS for c in b)
+    return False
+
+
+def _retry_on(exceptions, tries=MAX_HTTP_CONNECTION_RETRIES,
+              base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY):
+    """
+    Decorator to retry a function call if it raises one of the
+    given exceptions, with exponential backoff and jitter between
+    tries. The last exception is re-raised once all tries are exhausted.
+
+    :param exceptions: Exceptions to retry on
+    :type exceptions: tuple
+
+    :param tries: Number of tries, defaults to
+                  `MAX_HTTP_CONNECTION_RETRIES`
+    :type tries: int
+
+    :param base_delay: Delay in seconds before the first retry,
+                       defaults to `RETRY_BASE_DELAY`
+    :type base_delay: float
+
+    :param max_delay: Upper bound of delay in seconds between tries,
+                      defaults to `RETRY_MAX_DELAY`
+    :type max_delay: float
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            retries = tries
+            while True:
+                try:
+                    return func(*args, **kwargs)
+                except exceptions as conn_err:
+                    print(conn_err)
+                    log.warn(conn_err)
+                    retries -= 1
+                    if not retries:
+                        raise
+                    attempt = tries - retries - 1
+                    delay = min(max_delay, base_delay * (2 ** attempt))
+                    time.sleep(delay + random.random() * base_delay)
+                    print("Retries left:", retries)
+                    log.info("Retries left: %s", retries)
+        return wrapper
+    return decorator
+
 
 def get_nodes(vars=None):
     """
@@ -52,11 +164,11 @@ def get_nodes(vars=None):
     except Exception as get_nodes_err:
         log.error(get_nodes_err)
     else:
-        if len(nodes.keys()) == 0:
+        if not nodes:
             print('User is not associated with any nodes.')
             return
-        for key in nodes.keys():
-            print(nodes[key].get_nodeid())
+        sys.stdout.write('\n'.join(n.get_nodeid() for n in nodes.values()) +
+                         '\n')
     return
 
 
@@ -78,7 +190,7 @@ def get_node_config(vars=None):
     except Exception as get_nodes_err:
         log.error(get_nodes_err)
     else:
-        print(json.dumps(node_config, indent=4))
+        _print_json(node_config)
     return node_config
 
 
@@ -100,7 +212,7 @@ def get_node_status(vars=None):
     except Exception as get_node_status_err:
         log.error(get_node_status_err)
     else:
-        print(json.dumps(node_status, indent=4))
+        _print_json(node_status)
     return
 
 
@@ -122,7 +234,7 @@ def set_params(vars=None):
     :return: None on Success
     :rtype: None
     """
-    log.info('Setting params of the node with nodeid : ' + vars['nodeid'])
+    log.info('Setting params of the node with nodeid : %s', vars['nodeid'])
     if 'data' in vars:
         data = vars['data']
     if 'filepath' in vars:
@@ -130,30 +242,28 @@ def set_params(vars=None):
 
     if data is not None:
         log.debug('Setting node parameters using JSON data.')
-        # Trimming white spaces except the ones between two strings
-        data = re.sub(r"(?<![a-z]|[A-Z])\s(?![a-z]|[A-Z])|\
-            (?<=[a-z]|[A-Z])\s(?![a-z]|[A-Z])|\
-                (?<![a-z]|[A-Z])\s(?=[a-z]|[A-Z])", "", data)
+        if len(data.encode('utf-8')) > MAX_PARAMS_DATA_SIZE:
+            raise ValueError('Param payload too large.')
         try:
-            log.debug('JSON data : ' + data)
-            data = json.loads(data)
+            log.debug('JSON data : %s', data)
+            data = json_utils.loads(data)
         except Exception:
-            raise InvalidJSONError
-            return
+            raise InvalidJSONError() from None
 
     elif filepath is not None:
         log.debug('Setting node parameters using JSON file.')
         file = Path(filepath)
         if not file.exists():
-            log.error('File %s does not exist!' % file.name)
+            log.error('File %s does not exist!', file.name)
             return
-        with open(file) as fh:
+        if file.stat().st_size > MAX_PARAMS_DATA_SIZE:
+            raise ValueError('Param payload too large.')
+        with open(file, 'rb') as fh:
             try:
-                data = json.load(fh)
-                log.debug('JSON filename :' + file.name)
+                data = json_utils.loads(fh.read())
+                log.debug('JSON filename :%s', file.name)
             except Exception:
-                raise InvalidJSONError
-                return
+                raise InvalidJSONError() from None
 
     try:
         n = node.Node(vars['nodeid'], session.Session())
@@ -198,7 +308,7 @@ def get_params(vars=None):
             log.error('Node status not updated.')
             return
         else:
-            print(json.dumps(params, indent=4))
+            _print_json(params)
     return params
 
 
@@ -217,7 +327,7 @@ def remove_node(vars=None):
     :return: None on Success
     :rtype: None
     """
-    log.info('Removing user node mapping for node ' + vars['nodeid'])
+    log.info('Removing user node mapping for node %s', vars['nodeid'])
     try:
         n = node.Node(vars['nodeid'], session.Session())
         params = n.remove_user_node_mapping()
@@ -229,11 +339,69 @@ def remove_node(vars=None):
     return
 
 
+def _mqtt_host_cache_path():
+    """
+    Get path of the MQTT Host endpoint cache file.
+
+    :return: Path of cache file
+    :rtype: Path
+    """
+    return Path(path.expanduser(configmanager.HOME_DIRECTORY +
+                                configmanager.CONFIG_DIRECTORY),
+                MQTT_HOST_CACHE_FILE)
+
+
+def _read_mqtt_host_cache(request_url):
+    """
+    Read MQTT Host endpoint from cache file.
+
+    :param request_url: URL the MQTT Host endpoint was received from
+    :type request_url: str
+
+    :return: MQTT Host endpoint if cached and not expired, None otherwise
+    :rtype: str | None
+    """
+    cache_path = _mqtt_host_cache_path()
+    try:
+        if time.time() - cache_path.stat().st_mtime >= MQTT_HOST_CACHE_TTL:
+            return None
+        with open(cache_path, 'rb') as fh:
+            cache = json_utils.loads(fh.read())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cache, dict) or cache.get('url') != request_url:
+        return None
+    mqtt_host = cache.get('mqtt_host')
+    if not isinstance(mqtt_host, str) or not mqtt_host:
+        return None
+    return mqtt_host
+
+
+def _write_mqtt_host_cache(request_url, mqtt_host):
+    """
+    Save MQTT Host endpoint to cache file.
+
+    :param request_url: URL the MQTT Host endpoint was received from
+    :type request_url: str
+
+    :param mqtt_host: MQTT Host endpoint
+    :type mqtt_host: str
+    """
+    cache_path = _mqtt_host_cache_path()
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json_utils.dumps({'url': request_url,
+                                           'mqtt_host': mqtt_host}))
+    except OSError as cache_err:
+        log.debug("Failed to save MQTT Host cache: %s", cache_err)
+
+
 def get_mqtt_host(vars=None):
     """
     Returns MQTT Host endpoint
 
-    :param vars: No Parameters passed, defaults to `None`
+    :param vars: `no_cache` as key - Skip the cached MQTT Host endpoint,
+                 defaults to `None`
     :type vars: dict | None
 
     :raises NetworkError: If there is a network connection issue while
@@ -245,28 +413,37 @@ def get_mqtt_host(vars=None):
     :rtype: str
     """
     log.info("Getting MQTT Host endpoint.")
-    path = 'mqtt_host'
-    request_url = serverconfig.HOST.split(serverconfig.VERSION)[0] + path
+    request_url = serverconfig.HOST.split(serverconfig.VERSION)[0] + \
+        'mqtt_host'
+    if not (vars and vars.get('no_cache')):
+        mqtt_host = _read_mqtt_host_cache(request_url)
+        if mqtt_host:
+            log.info("Received MQTT Host endpoint from cache.")
+            print(mqtt_host)
+            return mqtt_host
     try:
-        log.debug("Get MQTT Host request url : " + request_url)
-        response = requests.get(url=request_url,
-                                verify=configmanager.CERT_FILE)
-        log.debug("Get MQTT Host response : " + response.text)
+        log.debug("Get MQTT Host request url : %s", request_url)
+        response = http_session.SESSION.get(url=request_url,
+                                            verify=configmanager.CERT_FILE,
+                                            timeout=10)
+        log.debug("Get MQTT Host response : %s", response.text)
         response.raise_for_status()
     except requests.exceptions.SSLError:
         raise SSLError
+    except requests.exceptions.Timeout:
+        raise RequestTimeoutError
     except requests.ConnectionError:
         raise NetworkError
-        return
     except Exception as mqtt_host_err:
         log.error(mqtt_host_err)
         return
     try:
-        response = json.loads(response.text)
+        response = json_utils.loads(response.text)
     except Exception as json_decode_err:
         log.error(json_decode_err)
     if 'mqtt_host' in response:
         log.info("Received MQTT Host endpoint successfully.")
+        _write_mqtt_host_cache(request_url, response['mqtt_host'])
         print(response['mqtt_host'])
     else:
         log.error("MQTT Host does not exists.")
@@ -302,8 +479,9 @@ def claim_node(vars=None):
         if (not vars['mac'] and vars['platform']):
             sys.exit("Invalid. --mac argument needed.")
         if vars['mac']:
-            if not re.match(r'([0-9A-F]:?){12}', vars['mac']):
+            if not _valid_mac(vars['mac']):
                 sys.exit('Invalid MAC address.')
+            vars['mac'] = vars['mac'].replace(':', '').upper()
         if vars['platform'].lower() == "esp32" and vars['secret_key']:
             sys.exit("Invalid. --secret-key argument not applicable for esp32 platform")
         claim(port=vars['port'], node_platform=vars['platform'], mac_addr=vars['mac'], secret_key=vars['secret_key'], flash_address=vars['addr'])
@@ -319,138 +497,125 @@ def ota_upgrade(vars=None):
     """
     try:
         node_id = vars['nodeid']
-        img_file_path = vars['otaimagepath']
-        if os.path.isabs(img_file_path) is False:
-            img_file_path = os.path.join(os.getcwd(), img_file_path)
-        img_name = img_file_path.split('/')[-1].split('.bin')[0]
-        with open(img_file_path, 'rb') as f:
-            fw_img_bytes = f.read()
-        base64_fw_img = base64.b64encode(fw_img_bytes).decode('ascii')
-
-        retries = MAX_HTTP_CONNECTION_RETRIES
-        node_object = None
-        status = None
-        response = None
-        service_name = None
-        service_obj = None
-        service_config = None
-        node_params = None
-        param_url_to_set = None
-        curr_session = None
-        while retries > 0:
-            try:
-                # If session is expired then to initialise the new session
-                # internet connection is required.
-                if not curr_session:
-                    curr_session = session.Session()
-                if not node_object:
-                    node_object = node.Node(node_id, curr_session)
-                    log.info("Creating service object...")
-                if not service_obj:
-                    service_obj = service.Service()
-                    log.info("Checking service " + service.OTA_SERVICE_TYPE + " in node config...")
-                    print("Checking " + service.OTA_SERVICE_TYPE + " in node config...")
-                if not service_config and not service_name:
-                    service_config, service_name = service_obj.verify_service_exists(node_object, service.OTA_SERVICE_TYPE)
-                    if not service_config:
-                        log.error(service.OTA_SERVICE_TYPE + " not found.")
-                        break
-                    log.info("Checking service " + service.OTA_SERVICE_TYPE + " in config...Success")
-                    log.debug("Service config received: " + str(service_config) +
-                              " Service name received: " + str(service_name))
-                    print("Uploading OTA Firmware Image...This may take time...")
-                    log.info("Uploading OTA Firmware Image...This may take time...")
-                if not status and not response:
-                    # Upload OTA Firwmare Image
-                    status, response = service_obj.upload_ota_image(node_object, img_name, base64_fw_img)
-                    if status:
-                        break
-            except SSLError:
-                log.error(SSLError())
-                break
-            except (NetworkError, RequestTimeoutError) as conn_err:
-                print(conn_err)
-                log.warn(conn_err)
-            except Exception as node_init_err:
-                log.error(node_init_err)
-                break
-            time.sleep(5)
-            retries -= 1
-            if retries:
-                print("Retries left:", retries)
-                log.info("Retries left: " + str(retries))
-
-        if node_object is None:
-            log.error('Initialising new session...Failed\n')
+        img_file_path = Path(vars['otaimagepath'])
+        if not img_file_path.is_absolute():
+            img_file_path = Path.cwd() / img_file_path
+        if not img_file_path.is_file():
+            log.error('File %s does not exist!', img_file_path)
             return
+        img_name = img_file_path.stem
+        raw_upload = vars.get('raw_upload', False)
+        base64_fw_img = None
+
+        ota_service_type = service.OTA_SERVICE_TYPE
+        service_obj = service.Service()
+
+        @_retry_on((NetworkError, RequestTimeoutError))
+        def _ensure_session():
+            # If session is expired then to initialise the new session
+            # internet connection is required.
+            return node.Node(node_id, session.Session())
+
+        @_retry_on((NetworkError, RequestTimeoutError))
+        def _ensure_service(node_object):
+            return service_obj.verify_service_exists(node_object,
+                                                     ota_service_type)
+
+        @_retry_on((NetworkError, RequestTimeoutError))
+        def _upload(node_object):
+            nonlocal raw_upload, base64_fw_img
+            if raw_upload:
+                try:
+                    status, response = service_obj.upload_ota_image_raw(
+                        node_object, img_name, img_file_path)
+                except requests.exceptions.HTTPError as raw_upload_err:
+                    status, response = None, str(raw_upload_err)
+                if status and 'success' in status:
+                    return status, response
+                log.warn("Raw OTA Firmware Image upload failed: %s"
+                         " Falling back to base64 upload.", response)
+                raw_upload = False
+            # Encoded once, so that retries do not re-read the image
+            if base64_fw_img is None:
+                base64_fw_img = _b64encode_file(img_file_path)
+            return service_obj.upload_ota_image(node_object, img_name,
+                                                base64_fw_img)
+
+        @_retry_on((NetworkError, RequestTimeoutError))
+        def _start_ota(node_object, service_name, service_write_params,
+                       param_url_to_set):
+            node_params = node_object.get_node_params()
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Node params received: %s",
+                          json_utils.dumps(node_params))
+            print("Setting the OTA URL parameter...")
+            return service_obj.start_ota(node_object, node_params,
+                                         service_name, service_write_params,
+                                         param_url_to_set)
+
+        @_retry_on((NetworkError, RequestTimeoutError))
+        def _poll_status(node_object, service_name, service_read_params):
+            return service_obj.check_ota_status(node_object, service_name,
+                                                service_read_params)
+
+        node_object = _ensure_session()
+
+        log.info("Checking service %s in node config...", ota_service_type)
+        print("Checking " + ota_service_type + " in node config...")
+        service_config, service_name = _ensure_service(node_object)
+        if not service_config:
+            log.error("%s not found.", ota_service_type)
+            return
+        log.info("Checking service %s in config...Success", ota_service_type)
+        log.debug("Service config received: %s Service name received: %s",
+                  service_config, service_name)
 
+        print("Uploading OTA Firmware Image...This may take time...")
+        log.info("Uploading OTA Firmware Image...This may take time...")
+        status, response = _upload(node_object)
         if not status or not 'success' in status:
             print("\n")
             log.error("OTA Upgrade...Failed")
-            log.debug('OTA Upgrade...Failed '
-                      'status: ' + str(status) + ' response: ' + str(response))
+            log.debug('OTA Upgrade...Failed status: %s response: %s',
+                      status, response)
             return
-
         log.info('Upload OTA Firmware Image Request...Success')
-        log.debug("Upload OTA Firmware Image Request - Status: " + json.dumps(status) +
-                  " Response: " + json.dumps(response))
-
-
-        retries = MAX_HTTP_CONNECTION_RETRIES
-        ota_start_status = None
-        node_params = None
-        service_read_params = None
-        service_write_params = None
-        ota_status = None
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Upload OTA Firmware Image Request - Status: %s"
+                      " Response: %s",
+                      json_utils.dumps(status), json_utils.dumps(response))
+        if 'image_url' not in response:
+            log.error("OTA Upgrade...Failed")
+            log.debug('OTA Upgrade...Failed '
+                      'image_url not found in response: %s', response)
+            return
 
-        while retries > 0:
-            try:
-                if 'image_url' in response:
-                    param_url_to_set = response["image_url"]
-
-                    if not service_read_params and not service_write_params:
-                        log.info("Getting service params from node config")
-                        service_read_params, service_write_params = service_obj.get_service_params(service_config)
-                        log.debug("Service params received with read properties: " + str(service_read_params) +
-                                  " Service params received with write properties: " + str(service_write_params))
-                        log.info("Getting node params...")
-                    if not node_params:
-                        node_params = node_object.get_node_params()
-                        log.debug("Node params received: " + json.dumps(node_params))
-                        print("Setting the OTA URL parameter...")
-
-                    if not ota_start_status:
-                        ota_start_status = service_obj.start_ota(node_object, node_params, service_name,
-                                                        service_write_params, param_url_to_set)
-                        log.debug("OTA status received: " + str(ota_start_status))
-                        if not ota_start_status:
-                            log.error("Failed to start OTA service...Exiting...")
-                            break
-                        print("Getting OTA Status...")
-                    if not ota_status:
-                        ota_status = service_obj.check_ota_status(node_object, service_name, service_read_params)
-                        break
-            except SSLError:
-                log.error(SSLError())
-                break
-            except (NetworkError, RequestTimeoutError) as conn_err:
-                print(conn_err)
-                log.warn(conn_err)
-            except Exception as node_init_err:
-                log.error(node_init_err)
-                break
-            time.sleep(5)
-            retries -= 1
-            if retries:
-                print("Retries left:", retries)
-                log.info("Retries left: " + str(retries))
+        log.info("Getting service params from node config")
+        service_read_params, service_write_params = service_obj.get_service_params(service_config)
+        log.debug("Service params received with read properties: %s"
+                  " Service params received with write properties: %s",
+                  service_read_params, service_write_params)
+        log.info("Getting node params...")
+        ota_start_status = _start_ota(node_object, service_name,
+                                      service_write_params,
+                                      response['image_url'])
+        log.debug("OTA status received: %s", ota_start_status)
+        if not ota_start_status:
+            log.error("Failed to start OTA service...Exiting...")
+            return
 
+        print("Getting OTA Status...")
+        ota_status = _poll_status(node_object, service_name,
+                                  service_read_params)
         if ota_status in [None, False]:
             log.error("OTA Upgrade...Failed")
-            log.debug('OTA Upgrade...Failed '
-                      'ota_status: ' + str(ota_status))
+            log.debug('OTA Upgrade...Failed ota_status: %s', ota_status)
+    except SSLError:
+        log.error(SSLError())
+    except (NetworkError, RequestTimeoutError):
+        log.error("OTA Upgrade...Failed")
     except KeyError as key_err:
-        log.error("Key Error: " + str(key_err))
+        log.error("Key Error: %s", key_err)
     except Exception as ota_err:
         log.error(ota_err)
     return
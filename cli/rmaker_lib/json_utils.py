@@ -0,0 +1,72 @@
+# Copyright 2020 Espressif Systems (Shanghai) PTE LTD
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+# Use the fastest JSON library available: orjson, then ujson,
+# then the stdlib json module.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def dumps(obj, indent=None):
+    """
+    Serialize `obj` to a JSON formatted str.
+
+    :param obj: Object to serialize
+    :type obj: dict | list | str
+
+    :param indent: Number of spaces to indent output with, compact
+                   output if not set, defaults to `None`.
+                   orjson only supports 2 space indentation, so with
+                   orjson any `indent` gives 2 space indented output.
+    :type indent: int | None
+
+    :return: JSON formatted str
+    :rtype: str
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, option=option).decode('utf-8')
+    if ujson is not None:
+        return ujson.dumps(obj, indent=indent or 0,
+                           escape_forward_slashes=False)
+    if indent is None:
+        return json.dumps(obj, separators=(',', ':'))
+    return json.dumps(obj, indent=indent)
+
+
+def loads(data):
+    """
+    Deserialize JSON `data`.
+
+    :param data: JSON data to deserialize
+    :type data: str | bytes
+
+    :raises ValueError: If `data` is not valid JSON
+
+    :return: Deserialized object
+    :rtype: dict | list
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if ujson is not None:
+        return ujson.loads(data)
+    return json.loads(data)
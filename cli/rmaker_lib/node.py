@@ -13,9 +13,9 @@
 # limitations under the License.
 
 import requests
-import json
+import logging
 import socket
-from rmaker_lib import serverconfig, configmanager
+from rmaker_lib import serverconfig, configmanager, http_session, json_utils
 from requests.exceptions import Timeout, ConnectionError,\
                                 RequestException
 from rmaker_lib.exceptions import NetworkError, InvalidClassInput, SSLError,\
@@ -76,9 +76,9 @@ class Node:
         getnodestatus_url = serverconfig.HOST + path + '?' + query_parameters
         try:
             log.debug("Get node status request url : " + getnodestatus_url)
-            response = requests.get(url=getnodestatus_url,
-                                    headers=self.request_header,
-                                    verify=configmanager.CERT_FILE)
+            response = http_session.SESSION.get(url=getnodestatus_url,
+                                                headers=self.request_header,
+                                                verify=configmanager.CERT_FILE)
             log.debug("Get node status response : " + response.text)
             response.raise_for_status()
         except requests.exceptions.SSLError:
@@ -111,10 +111,10 @@ class Node:
         getnodeconfig_url = serverconfig.HOST + path + '?' + query_parameters
         try:
             log.debug("Get node config request url : " + getnodeconfig_url)
-            response = requests.get(url=getnodeconfig_url,
-                                    headers=self.request_header,
-                                    verify=configmanager.CERT_FILE,
-                                    timeout=(5.0, 5.0))
+            response = http_session.SESSION.get(url=getnodeconfig_url,
+                                                headers=self.request_header,
+                                                verify=configmanager.CERT_FILE,
+                                                timeout=(5.0, 5.0))
             log.debug("Get node config response : " + response.text)
             response.raise_for_status()
         except requests.exceptions.SSLError:
@@ -152,10 +152,10 @@ class Node:
         getparams_url = serverconfig.HOST + path + '?' + query_parameters
         try:
             log.debug("Get node params request url : " + getparams_url)
-            response = requests.get(url=getparams_url,
-                                    headers=self.request_header,
-                                    verify=configmanager.CERT_FILE,
-                                    timeout=(5.0, 5.0))
+            response = http_session.SESSION.get(url=getparams_url,
+                                                headers=self.request_header,
+                                                verify=configmanager.CERT_FILE,
+                                                timeout=(5.0, 5.0))
             log.debug("Get node params response : " + response.text)
             response.raise_for_status()
         except requests.exceptions.SSLError:
@@ -169,7 +169,7 @@ class Node:
             log.debug(get_nodes_params_err)
             raise get_nodes_params_err
 
-        response = json.loads(response.text)
+        response = json_utils.loads(response.text)
         if 'status' in response and response['status'] == 'failure':
             return None
         log.info("Received node parameters successfully.")
@@ -197,15 +197,18 @@ class Node:
         query_parameters = 'nodeid=' + self.__nodeid
         setparams_url = serverconfig.HOST + path + '?' + query_parameters
         try:
-            log.debug("Set node params request url : " + setparams_url)
-            log.debug("Set node params request payload : " + json.dumps(data))
-            log.debug("Set node params request header : " + json.dumps(self.request_header))
-            response = requests.put(url=setparams_url,
-                                    data=json.dumps(data),
-                                    headers=self.request_header,
-                                    verify=configmanager.CERT_FILE,
-                                    timeout=(5.0, 5.0))
-            log.debug("Set node params response : " + response.text)
+            log.debug("Set node params request url : %s", setparams_url)
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Set node params request payload : %s",
+                          json_utils.dumps(data))
+                log.debug("Set node params request header : %s",
+                          json_utils.dumps(self.request_header))
+            response = http_session.SESSION.put(url=setparams_url,
+                                                data=json_utils.dumps(data),
+                                                headers=self.request_header,
+                                                verify=configmanager.CERT_FILE,
+                                                timeout=(5.0, 5.0))
+            log.debug("Set node params response : %s", response.text)
             response.raise_for_status()
         except requests.exceptions.SSLError:
             raise SSLError
@@ -256,11 +259,11 @@ class Node:
             log.debug("User node mapping request url : " + request_url)
             log.debug("User node mapping request payload : " +
                       str(request_payload))
-            response = requests.put(url=request_url,
-                                    data=json.dumps(request_payload),
-                                    headers=self.request_header,
-                                    verify=configmanager.CERT_FILE,
-                                    timeout=(5.0, 5.0))
+            response = http_session.SESSION.put(url=request_url,
+                                                data=json_utils.dumps(request_payload),
+                                                headers=self.request_header,
+                                                verify=configmanager.CERT_FILE,
+                                                timeout=(5.0, 5.0))
             log.debug("User node mapping response : " + response.text)
             response.raise_for_status()
         except requests.exceptions.SSLError as ssl_err:
@@ -277,7 +280,7 @@ class Node:
             raise mapping_status_err
 
         try:
-            response = json.loads(response.text)
+            response = json_utils.loads(response.text)
         except Exception as user_node_mapping_err:
             raise user_node_mapping_err
 
@@ -349,10 +352,10 @@ class Node:
         try:
             log.debug("Check user node mapping status request url : " +
                       request_url)
-            response = requests.get(url=request_url,
-                                    headers=self.request_header,
-                                    verify=configmanager.CERT_FILE,
-                                    timeout=(5.0, 5.0))
+            response = http_session.SESSION.get(url=request_url,
+                                                headers=self.request_header,
+                                                verify=configmanager.CERT_FILE,
+                                                timeout=(5.0, 5.0))
             log.debug("Check user node mapping status response : " +
                       response.text)
             response.raise_for_status()
@@ -370,7 +373,7 @@ class Node:
             raise mapping_status_err
 
         try:
-            response = json.loads(response.text)
+            response = json_utils.loads(response.text)
         except Exception as mapping_status_err:
             raise mapping_status_err
 
@@ -13,11 +13,12 @@
 # limitations under the License.
 
 import requests
-import json
+import logging
 import socket
 import time
 import datetime
-from rmaker_lib import serverconfig, configmanager, node
+from rmaker_lib import serverconfig, configmanager, node, http_session,\
+                       json_utils
 from requests.exceptions import Timeout, ConnectionError,\
                                 RequestException
 from rmaker_lib.exceptions import NetworkError, SSLError,\
@@ -104,7 +105,9 @@ class Service:
         """
         ota_status = ""
         ota_status_empty_str = "(empty)"
-        log.debug("Received service read params: " + json.dumps(service_read_params))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Received service read params: %s",
+                      json_utils.dumps(service_read_params))
         ota_status_key = service_read_params[OTA_PARAMS['status']]
         ota_info_key = service_read_params[OTA_PARAMS['info']]
         log.debug("OTA Status Key : " + str(ota_status_key))
@@ -199,7 +202,9 @@ class Service:
         log.debug("OTA URL Key : " + str(ota_url_key))
         log.debug("Setting new url: " + str(url_to_set))
         params_to_set = {service_name: {ota_url_key: url_to_set}}
-        log.debug("New node params after setting url: " + json.dumps(params_to_set))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("New node params after setting url: %s",
+                      json_utils.dumps(params_to_set))
         set_node_status = node_obj.set_node_params(params_to_set)
         if not set_node_status:
             return False
@@ -213,8 +218,53 @@ class Service:
         """
         Push OTA Firware image to cloud
 
-        :param node_id: Node Id
-        :type node_id: str
+        :param node: Node Object
+        :type node: object
+
+        :param img_name: Firmware Image name
+        :type img_name: str
+
+        :param fw_img: Base64 encoded Firmware Image
+        :type fw_img: bytes | bytearray | str
+
+        :raises SSLError: If there is any SSL authentication error
+        :raises NetworkError: If there is a network connection issue while
+                              push firmware image to cloud
+        :raises RequestTimeoutError: If the request is sent but there
+                                     is no response from server within
+                                     the timeout
+        :raises Exception: If there is an HTTP issue while pushing
+                           firmware image to cloud or JSON format issue
+                           in HTTP response
+
+        :return: Request Status on Success, None on Failure
+        :type: str | None
+        """
+        socket.setdefaulttimeout(100)
+        path = 'user/ota_image'
+        if isinstance(fw_img, str):
+            fw_img = fw_img.encode('ascii')
+        # Base64 output never needs JSON escaping, so the request body is
+        # assembled directly instead of passing the image through json.dumps
+        request_payload = b''.join([
+            b'{"image_name": ', json_utils.dumps(img_name).encode('utf-8'),
+            b', "base64_fwimage": "', fw_img, b'"}'
+        ])
+
+        return self._post_ota_image(path,
+                                    data=request_payload,
+                                    headers=node.request_header)
+
+    def upload_ota_image_raw(self, node, img_name, img_file_path):
+        """
+        Push OTA Firware image to cloud as multipart/form-data,
+        without base64 encoding it
+
+        :param node: Node Object
+        :type node: object
+
+        :param img_name: Firmware Image name
+        :type img_name: str
 
         :param img_file_path: Firmware Image filepath
         :type img_file_path: str
@@ -234,21 +284,41 @@ class Service:
         """
         socket.setdefaulttimeout(100)
         path = 'user/ota_image'
-        request_payload = {
-            'image_name': img_name,
-            'base64_fwimage': fw_img
-        }
+        # Content type is set by requests with the multipart boundary
+        headers = {k: v for k, v in node.request_header.items()
+                   if k.lower() != 'content-type'}
+        with open(img_file_path, 'rb') as fw_img_file:
+            return self._post_ota_image(
+                path,
+                data={'image_name': img_name},
+                files={'firmware': (img_name + '.bin', fw_img_file,
+                                    'application/octet-stream')},
+                headers=headers)
+
+    def _post_ota_image(self, path, **request_kwargs):
+        """
+        Send OTA Firmware image upload request
 
+        :param path: Request path
+        :type path: str
+
+        :param request_kwargs: Keyword arguments for the POST request
+        :type request_kwargs: dict
+
+        :return: Request Status and response on Success,
+                 None and response text if response is not valid JSON,
+                 None and None if response has no status
+        :type: str,dict | None,str | None,None
+        """
         request_url = serverconfig.HOST + path
         try:
             log.debug("Uploading OTA Firmware Image Request URL : " +
                       str(request_url)
                      )
-            response = requests.post(url=request_url,
-                                     data=json.dumps(request_payload),
-                                     headers=node.request_header,
-                                     verify=configmanager.CERT_FILE,
-                                     timeout=(60.0, 60.0))
+            response = http_session.SESSION.post(url=request_url,
+                                                 verify=configmanager.CERT_FILE,
+                                                 timeout=(60.0, 60.0),
+                                                 **request_kwargs)
             log.debug("Uploading OTA Firmware Image Status Response : " +
                       str(response.text))
             response.raise_for_status()
@@ -266,10 +336,11 @@ class Service:
             raise mapping_status_err
 
         try:
-            response = json.loads(response.text)
-        except Exception as upload_img_status_err:
-            raise upload_img_status_err
+            response_json = json_utils.loads(response.text)
+        except ValueError:
+            log.debug("OTA Firmware Image upload response is not valid JSON")
+            return None, response.text
 
-        if 'status' in response:
-            return response['status'], response
+        if isinstance(response_json, dict) and 'status' in response_json:
+            return response_json['status'], response_json
         return None, None
@@ -13,8 +13,7 @@
 # limitations under the License.
 
 import requests
-import json
-from rmaker_lib import serverconfig, configmanager
+from rmaker_lib import serverconfig, configmanager, http_session, json_utils
 from rmaker_lib import node
 from rmaker_lib.exceptions import NetworkError, InvalidConfigError, SSLError
 from rmaker_lib.logger import log
@@ -53,9 +52,9 @@ class Session:
         getnodes_url = serverconfig.HOST + path
         try:
             log.debug("Get nodes request url : " + getnodes_url)
-            response = requests.get(url=getnodes_url,
-                                    headers=self.request_header,
-                                    verify=configmanager.CERT_FILE)
+            response = http_session.SESSION.get(url=getnodes_url,
+                                                headers=self.request_header,
+                                                verify=configmanager.CERT_FILE)
             log.debug("Get nodes request response : " + response.text)
             response.raise_for_status()
         except requests.exceptions.SSLError:
@@ -66,7 +65,7 @@ class Session:
             raise Exception(response.text)
 
         node_map = {}
-        for nodeid in json.loads(response.text)['nodes']:
+        for nodeid in json_utils.loads(response.text)['nodes']:
             node_map[nodeid] = node.Node(nodeid, self)
         log.info("Received nodes for user successfully.")
         return node_map
@@ -88,8 +87,8 @@ class Session:
         request_url = serverconfig.HOST.split(serverconfig.VERSION)[0] + path
         try:
             log.debug("Get MQTT Host request url : " + request_url)
-            response = requests.get(url=request_url,
-                                    verify=configmanager.CERT_FILE)
+            response = http_session.SESSION.get(url=request_url,
+                                                verify=configmanager.CERT_FILE)
             log.debug("Get MQTT Host response : " + response.text)
             response.raise_for_status()
         except requests.exceptions.SSLError:
@@ -100,7 +99,7 @@ class Session:
             raise mqtt_host_err
 
         try:
-            response = json.loads(response.text)
+            response = json_utils.loads(response.text)
         except Exception as json_decode_err:
             raise json_decode_err
 
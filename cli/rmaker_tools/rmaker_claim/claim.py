@@ -494,7 +494,9 @@ def get_mqtt_endpoint():
     # Set node claim data
     sys.stdout = StringIO()
     log.info("Getting MQTT Host")
-    endpointinfo = node.get_mqtt_host(None)
+    # Claim data is written to the device, so always use the
+    # current endpoint instead of the cached one
+    endpointinfo = node.get_mqtt_host({'no_cache': True})
     log.debug("Endpoint info received: " + endpointinfo)
     sys.stdout = sys.__stdout__
     return endpointinfo
@@ -0,0 +1,25 @@
+# Copyright 2020 Espressif Systems (Shanghai) PTE LTD
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+# The claim tool needs ESP-IDF (esptool, nvs_partition_gen) at import time.
+# It is not used by these tests, so a placeholder module is registered.
+_claim = types.ModuleType('rmaker_tools.rmaker_claim.claim')
+_claim.claim = None
+sys.modules.setdefault('rmaker_tools.rmaker_claim.claim', _claim)
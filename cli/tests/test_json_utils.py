@@ -0,0 +1,55 @@
+# Copyright 2020 Espressif Systems (Shanghai) PTE LTD
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from rmaker_lib import json_utils
+
+
+@pytest.fixture(params=['orjson', 'ujson', 'json'])
+def json_backend(request, monkeypatch):
+    if request.param in ('ujson', 'json'):
+        monkeypatch.setattr(json_utils, 'orjson', None)
+    if request.param == 'json':
+        monkeypatch.setattr(json_utils, 'ujson', None)
+    elif getattr(json_utils, request.param) is None:
+        pytest.skip(request.param + ' not installed')
+    return request.param
+
+
+def test_roundtrip(json_backend):
+    obj = {'url': 'https://example.com/fw', 'name': 'Living Room 1',
+           'params': [1, 2.5, True, None]}
+    assert json_utils.loads(json_utils.dumps(obj)) == obj
+    assert json_utils.loads(json_utils.dumps(obj, indent=4)) == obj
+    assert json_utils.loads(json_utils.dumps(obj).encode('utf-8')) == obj
+
+
+def test_compact(json_backend):
+    assert json_utils.dumps({'a': [1, 2]}) == '{"a":[1,2]}'
+
+
+def test_indent(json_backend):
+    expected_indent = 2 if json_backend == 'orjson' else 4
+    lines = json_utils.dumps({'a': 1}, indent=4).splitlines()
+    assert lines[1] == ' ' * expected_indent + '"a": 1'
+
+
+def test_forward_slashes_not_escaped(json_backend):
+    assert json_utils.dumps('https://example.com') == '"https://example.com"'
+
+
+def test_invalid(json_backend):
+    with pytest.raises(ValueError):
+        json_utils.loads('{"a": ')
@@ -0,0 +1,236 @@
+# Copyright 2020 Espressif Systems (Shanghai) PTE LTD
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import json
+import os
+import time
+from unittest import mock
+
+import pytest
+import requests
+
+from rmaker_cmd import node as node_cmd
+from rmaker_lib import http_session
+from rmaker_lib.exceptions import NetworkError
+
+
+def _set_params(data=None, filepath=None):
+    with mock.patch.object(node_cmd.session, 'Session'), \
+            mock.patch.object(node_cmd.node, 'Node') as node_cls:
+        node_cmd.set_params({'nodeid': 'abc', 'data': data,
+                             'filepath': filepath})
+    return node_cls.return_value.set_node_params.call_args[0][0]
+
+
+def test_set_params_preserves_whitespace_in_strings():
+    params = _set_params('{ "Light" : { "name" : " Living Room 1 " ,\n'
+                         '"power": true } }')
+    assert params == {'Light': {'name': ' Living Room 1 ', 'power': True}}
+
+
+def test_set_params_data_size_limit(monkeypatch):
+    monkeypatch.setattr(node_cmd, 'MAX_PARAMS_DATA_SIZE', 8)
+    assert _set_params('"abcdef"') == 'abcdef'
+    # 6 characters, but 10 bytes in UTF-8
+    with pytest.raises(ValueError):
+        _set_params('"éééé"')
+
+
+def test_set_params_file_size_limit(monkeypatch, tmp_path):
+    monkeypatch.setattr(node_cmd, 'MAX_PARAMS_DATA_SIZE', 8)
+    params_file = tmp_path / 'params.json'
+    params_file.write_text('"abcdef"')
+    assert _set_params(filepath=str(params_file)) == 'abcdef'
+    params_file.write_text('"abcdefg"')
+    with pytest.raises(ValueError):
+        _set_params(filepath=str(params_file))
+
+
+@pytest.mark.parametrize('mac', ['AABBCC112233', 'aabbcc112233',
+                                 'AA:BB:CC:11:22:33', 'aa:bb:cc:11:22:33'])
+def test_valid_mac(mac):
+    assert node_cmd._valid_mac(mac)
+
+
+@pytest.mark.parametrize('mac', ['', 'AABBCC11223', 'AABBCC1122334',
+                                 'AABBCC11223G', 'AA:BB:CC:11:22:3G',
+                                 'AA-BB-CC-11-22-33', 'AABB:CC:11:22:33:',
+                                 'é' * 12])
+def test_invalid_mac(mac):
+    assert not node_cmd._valid_mac(mac)
+
+
+def test_retry_on_exhaustion(monkeypatch):
+    monkeypatch.setattr(node_cmd.time, 'sleep', lambda delay: None)
+    func = mock.Mock(side_effect=NetworkError)
+    with pytest.raises(NetworkError):
+        node_cmd._retry_on((NetworkError,), tries=3)(func)()
+    assert func.call_count == 3
+
+
+def test_retry_on_success_after_failure(monkeypatch):
+    monkeypatch.setattr(node_cmd.time, 'sleep', lambda delay: None)
+    func = mock.Mock(side_effect=[NetworkError, 'ok'])
+    assert node_cmd._retry_on((NetworkError,), tries=3)(func)() == 'ok'
+    assert func.call_count == 2
+
+
+def test_retry_on_other_exception_not_retried(monkeypatch):
+    monkeypatch.setattr(node_cmd.time, 'sleep', lambda delay: None)
+    func = mock.Mock(side_effect=KeyError)
+    with pytest.raises(KeyError):
+        node_cmd._retry_on((NetworkError,), tries=3)(func)()
+    assert func.call_count == 1
+
+
+def test_retry_on_backoff_schedule(monkeypatch):
+    delays = []
+    monkeypatch.setattr(node_cmd.time, 'sleep', delays.append)
+    func = mock.Mock(side_effect=NetworkError)
+    with pytest.raises(NetworkError):
+        node_cmd._retry_on((NetworkError,), tries=10)(func)()
+    assert len(delays) == 9
+    for k, delay in enumerate(delays):
+        expected = min(30, 0.5 * 2 ** k)
+        assert expected <= delay < expected + 0.5
+
+
+@pytest.fixture
+def ota_mocks(monkeypatch, tmp_path):
+    monkeypatch.setattr(node_cmd.time, 'sleep', lambda delay: None)
+    img = tmp_path / 'fw.bin'
+    img.write_bytes(b'firmware image')
+    with mock.patch.object(node_cmd.session, 'Session') as session_cls, \
+            mock.patch.object(node_cmd.node, 'Node'), \
+            mock.patch.object(node_cmd.service, 'Service') as service_cls:
+        service_obj = service_cls.return_value
+        service_obj.verify_service_exists.return_value = ({'params': []},
+                                                          'OTA')
+        service_obj.upload_ota_image.return_value = ('success', {})
+        yield img, session_cls, service_obj
+
+
+def _ota_upgrade(img, raw_upload=False):
+    node_cmd.ota_upgrade({'nodeid': 'abc', 'otaimagepath': str(img),
+                          'raw_upload': raw_upload})
+
+
+def test_ota_upgrade_missing_image(ota_mocks, tmp_path):
+    img, session_cls, service_obj = ota_mocks
+    _ota_upgrade(tmp_path / 'missing.bin')
+    session_cls.assert_not_called()
+    service_obj.upload_ota_image.assert_not_called()
+
+
+def test_ota_upgrade_encodes_image_once(ota_mocks):
+    img, session_cls, service_obj = ota_mocks
+    service_obj.upload_ota_image.side_effect = [NetworkError,
+                                                ('success', {})]
+    with mock.patch.object(node_cmd, '_b64encode_file',
+                           wraps=node_cmd._b64encode_file) as encode:
+        _ota_upgrade(img)
+    assert encode.call_count == 1
+    assert service_obj.upload_ota_image.call_count == 2
+    fw_img = service_obj.upload_ota_image.call_args[0][2]
+    assert bytes(fw_img) == base64.b64encode(b'firmware image')
+
+
+@pytest.mark.parametrize('raw_result', [
+    requests.exceptions.HTTPError('415 Unsupported Media Type'),
+    ('failure', {'status': 'failure'}),
+    (None, 'not json'),
+])
+def test_ota_upgrade_raw_upload_falls_back(ota_mocks, raw_result):
+    img, session_cls, service_obj = ota_mocks
+    if isinstance(raw_result, Exception):
+        service_obj.upload_ota_image_raw.side_effect = raw_result
+    else:
+        service_obj.upload_ota_image_raw.return_value = raw_result
+    _ota_upgrade(img, raw_upload=True)
+    service_obj.upload_ota_image_raw.assert_called_once()
+    service_obj.upload_ota_image.assert_called_once()
+
+
+def test_ota_upgrade_raw_upload_success(ota_mocks):
+    img, session_cls, service_obj = ota_mocks
+    service_obj.upload_ota_image_raw.return_value = ('success', {})
+    _ota_upgrade(img, raw_upload=True)
+    service_obj.upload_ota_image_raw.assert_called_once()
+    service_obj.upload_ota_image.assert_not_called()
+
+
+@pytest.fixture
+def mqtt_host_get(monkeypatch, tmp_path):
+    cache_path = tmp_path / node_cmd.MQTT_HOST_CACHE_FILE
+    monkeypatch.setattr(node_cmd, '_mqtt_host_cache_path', lambda: cache_path)
+    with mock.patch.object(http_session.SESSION, 'get') as get:
+        get.return_value.text = '{"mqtt_host": "fresh.example.com"}'
+        yield get, cache_path
+
+
+def _mqtt_host_url():
+    return node_cmd.serverconfig.HOST.split(
+        node_cmd.serverconfig.VERSION)[0] + 'mqtt_host'
+
+
+def _write_cache(cache_path, mqtt_host='cached.example.com', url=None):
+    cache_path.write_text(json.dumps({'url': url or _mqtt_host_url(),
+                                      'mqtt_host': mqtt_host}))
+
+
+def test_get_mqtt_host_miss_writes_cache(mqtt_host_get):
+    get, cache_path = mqtt_host_get
+    assert node_cmd.get_mqtt_host() == 'fresh.example.com'
+    get.assert_called_once()
+    assert json.loads(cache_path.read_text()) == {
+        'url': _mqtt_host_url(), 'mqtt_host': 'fresh.example.com'}
+
+
+def test_get_mqtt_host_cache_hit(mqtt_host_get):
+    get, cache_path = mqtt_host_get
+    _write_cache(cache_path)
+    assert node_cmd.get_mqtt_host() == 'cached.example.com'
+    get.assert_not_called()
+
+
+def test_get_mqtt_host_cache_expired(mqtt_host_get):
+    get, cache_path = mqtt_host_get
+    _write_cache(cache_path)
+    expired = time.time() - node_cmd.MQTT_HOST_CACHE_TTL - 1
+    os.utime(cache_path, (expired, expired))
+    assert node_cmd.get_mqtt_host() == 'fresh.example.com'
+    get.assert_called_once()
+
+
+def test_get_mqtt_host_cache_url_mismatch(mqtt_host_get):
+    get, cache_path = mqtt_host_get
+    _write_cache(cache_path, url='https://other.example.com/mqtt_host')
+    assert node_cmd.get_mqtt_host() == 'fresh.example.com'
+    get.assert_called_once()
+
+
+@pytest.mark.parametrize('mqtt_host', ['', None, 123, ['host']])
+def test_get_mqtt_host_cache_invalid_value(mqtt_host_get, mqtt_host):
+    get, cache_path = mqtt_host_get
+    _write_cache(cache_path, mqtt_host=mqtt_host)
+    assert node_cmd.get_mqtt_host() == 'fresh.example.com'
+    get.assert_called_once()
+
+
+def test_get_mqtt_host_no_cache(mqtt_host_get):
+    get, cache_path = mqtt_host_get
+    _write_cache(cache_path)
+    assert node_cmd.get_mqtt_host({'no_cache': True}) == 'fresh.example.com'
+    get.assert_called_once()
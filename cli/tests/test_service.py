@@ -0,0 +1,52 @@
+# Copyright 2020 Espressif Systems (Shanghai) PTE LTD
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+import pytest
+
+from rmaker_lib import http_session, service
+
+
+@pytest.fixture
+def post():
+    with mock.patch.object(http_session.SESSION, 'post') as post:
+        yield post
+
+
+def test_post_ota_image_status(post):
+    post.return_value.text = '{"status": "success", "image_url": "url"}'
+    status, response = service.Service()._post_ota_image('user/ota_image')
+    assert status == 'success'
+    assert response == {'status': 'success', 'image_url': 'url'}
+
+
+@pytest.mark.parametrize('text', ['not json', '["success"]'])
+def test_post_ota_image_invalid_response(post, text):
+    post.return_value.text = text
+    status, response = service.Service()._post_ota_image('user/ota_image')
+    assert status is None
+
+
+def test_upload_ota_image_raw_multipart(post, tmp_path):
+    img = tmp_path / 'fw.bin'
+    img.write_bytes(b'firmware image')
+    post.return_value.text = '{"status": "success"}'
+    node_obj = mock.Mock(request_header={'content-type': 'application/json',
+                                         'Authorization': 'token'})
+    service.Service().upload_ota_image_raw(node_obj, 'fw', str(img))
+    kwargs = post.call_args[1]
+    assert kwargs['headers'] == {'Authorization': 'token'}
+    assert kwargs['data'] == {'image_name': 'fw'}
+    assert kwargs['files']['firmware'][0] == 'fw.bin'